@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+AISensy Stand-in
+Local stand-in for the AISensy campaign API, for load tests and benchmarks
+
+Answers every POST with a success body carrying a unique submitted_message_id
+after a configurable latency, so the send path runs end to end without touching
+the real account. Built on asyncio streams (keep-alive HTTP/1.1), so it can hold
+thousands of concurrent connections.
+
+Usage:
+    python aisensy_stub.py --port 8090 --latency 0.2 --error-rate 0.01
+    AISENSY_URL=http://127.0.0.1:8090/campaign/t2/api/v2 python main.py
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+class AISensyStub:
+    def __init__(self, latency: float = 0.2, error_rate: float = 0.0):
+        """Initialize the stand-in; latency is seconds per request, error_rate the share answered with 500"""
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.peak_concurrency = 0
+        self._active = 0
+        self._message_ids = itertools.count(1)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+
+                status, response = await self._respond(request_line, body)
+                data = json.dumps(response).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, request_line: bytes, body: bytes) -> tuple:
+        self.requests += 1
+        self._active += 1
+        self.peak_concurrency = max(self.peak_concurrency, self._active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self._active -= 1
+
+        if not request_line.startswith(b"POST"):
+            return 404, {"errorMessage": "Not found"}
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"errorMessage": "Invalid JSON"}
+        if not payload.get("destination") or not payload.get("campaignName"):
+            return 400, {"errorMessage": "destination and campaignName are required"}
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return 500, {"errorMessage": "Stub injected failure"}
+        return 200, {"success": "true", "submitted_message_id": f"stub-{next(self._message_ids)}"}
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "errors": self.errors, "peak_concurrency": self.peak_concurrency}
+
+
+async def serve(host: str, port: int, stub: AISensyStub):
+    server = await asyncio.start_server(stub.handle_connection, host, port, backlog=4096)
+    logger.info(f"AISensy stand-in on http://{host}:{port}/campaign/t2/api/v2 "
+                f"(latency {stub.latency}s, error rate {stub.error_rate})")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local stand-in for the AISensy campaign API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before each response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    stub = AISensyStub(args.latency, args.error_rate)
+    try:
+        asyncio.run(serve(args.host, args.port, stub))
+    except KeyboardInterrupt:
+        logger.info(f"Stand-in stopped: {stub.stats()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Async Send Engine
+asyncio + aiohttp transport for AISensy sends, for thousands of requests in flight from one process
+
+Opt in with AISENSY_SEND_ENGINE=async (requires aiohttp); otherwise both
+services keep sending through the per-tenant thread pools. The engine runs its
+own event loop on one daemon thread, so synchronous callers hand it a coroutine
+and get a concurrent.futures.Future back, just like Tenant.submit.
+
+Concurrency is bounded by asyncio semaphores: ASYNC_MAX_IN_FLIGHT requests
+across the process and ASYNC_TENANT_IN_FLIGHT per tenant, over a keep-alive
+pool of at most ASYNC_MAX_CONNECTIONS connections. Submissions beyond
+ASYNC_MAX_PENDING in total, or ASYNC_TENANT_MAX_PENDING for one tenant, are
+rejected instead of queueing without bound, so one tenant's burst cannot fill
+the engine for everyone else (the async counterpart of Tenant.submit's bound).
+
+Nothing that waits on locks or disk may run on the loop thread, including
+done-callbacks of the returned futures. Send coroutines hand their file I/O
+(quota state, delivery log, sent journal) and the per-send log lines of
+payload building to asyncio.to_thread, which runs on a pool of
+ASYNC_IO_THREADS workers. Outcome and error log lines from the coroutines and
+done-callbacks are still written on the loop thread, one short handler write
+each.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, only needed for AISENSY_SEND_ENGINE=async
+    aiohttp = None
+
+SEND_ENGINE = os.environ.get("AISENSY_SEND_ENGINE", "threads")
+ASYNC_MAX_IN_FLIGHT = int(os.environ.get("ASYNC_MAX_IN_FLIGHT", "2000"))
+ASYNC_TENANT_IN_FLIGHT = int(os.environ.get("ASYNC_TENANT_IN_FLIGHT", "1000"))
+ASYNC_MAX_CONNECTIONS = int(os.environ.get("ASYNC_MAX_CONNECTIONS", "1000"))
+ASYNC_MAX_PENDING = int(os.environ.get("ASYNC_MAX_PENDING", "20000"))
+ASYNC_TENANT_MAX_PENDING = int(os.environ.get("ASYNC_TENANT_MAX_PENDING", "5000"))
+ASYNC_IO_THREADS = int(os.environ.get("ASYNC_IO_THREADS", "32"))
+ASYNC_REQUEST_TIMEOUT = 30
+
+logger = logging.getLogger(__name__)
+
+
+class SendResponse:
+    """Buffered AISensy response exposing the parts of requests.Response the services use"""
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncSendEngine:
+    def __init__(self, max_in_flight: int = ASYNC_MAX_IN_FLIGHT, tenant_in_flight: int = ASYNC_TENANT_IN_FLIGHT,
+                 max_connections: int = ASYNC_MAX_CONNECTIONS, max_pending: int = ASYNC_MAX_PENDING,
+                 tenant_max_pending: int = ASYNC_TENANT_MAX_PENDING, request_timeout: float = ASYNC_REQUEST_TIMEOUT):
+        """Initialize the engine; its loop and connection pool start on the first submit"""
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is not installed")
+        self.max_in_flight = max_in_flight
+        self.tenant_in_flight = tenant_in_flight
+        self.max_connections = max_connections
+        self.max_pending = max_pending
+        self.tenant_max_pending = tenant_max_pending
+        self.request_timeout = request_timeout
+        self.loop = None
+        self.rejected = 0
+        self._pending = 0
+        self._tenant_pending = {}
+        self._tenant_rejected = {}
+        self._closed = False
+        self._session = None
+        self._global_limit = None
+        self._tenant_limits = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Started lazily so a forking server never inherits a dead loop thread
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="async-send", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _run(self, ready: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._open())
+        ready.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(self._close())
+        self.loop.close()
+
+    async def _open(self):
+        self.loop.set_default_executor(ThreadPoolExecutor(max_workers=ASYNC_IO_THREADS, thread_name_prefix="async-send-io"))
+        self._global_limit = asyncio.Semaphore(self.max_in_flight)
+        connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(connector=connector,
+                                              timeout=aiohttp.ClientTimeout(total=self.request_timeout))
+        logger.info(f"Async send engine started: {self.max_in_flight} in flight, "
+                    f"{self.tenant_in_flight} per tenant, {self.max_connections} connections")
+
+    async def _close(self):
+        tasks = [task for task in asyncio.all_tasks(self.loop) if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._session.close()
+        await self.loop.shutdown_default_executor()
+
+    def submit(self, coro, tenant_id: str):
+        """Run coro on the engine loop; returns a Future, or None when too many sends are pending
+        in total or for tenant_id"""
+        with self._lock:
+            tenant_pending = self._tenant_pending.get(tenant_id, 0)
+            if self._closed or self._pending >= self.max_pending or tenant_pending >= self.tenant_max_pending:
+                self.rejected += 1
+                self._tenant_rejected[tenant_id] = self._tenant_rejected.get(tenant_id, 0) + 1
+                coro.close()
+                logger.warning(f"Async send engine is full or stopped, rejecting send for tenant {tenant_id}")
+                return None
+            self._pending += 1
+            self._tenant_pending[tenant_id] = tenant_pending + 1
+            self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(lambda done: self._release(tenant_id))
+        return future
+
+    def _release(self, tenant_id: str):
+        with self._lock:
+            self._pending -= 1
+            self._tenant_pending[tenant_id] -= 1
+            if not self._tenant_pending[tenant_id]:
+                del self._tenant_pending[tenant_id]
+
+    async def post(self, url: str, payload: dict, tenant_id: str) -> SendResponse:
+        """POST JSON through the shared connection pool within the global and per-tenant limits"""
+        tenant_limit = self._tenant_limits.get(tenant_id)
+        if tenant_limit is None:
+            tenant_limit = self._tenant_limits[tenant_id] = asyncio.Semaphore(self.tenant_in_flight)
+        async with tenant_limit, self._global_limit:
+            async with self._session.post(url, json=payload) as response:
+                return SendResponse(response.status, await response.text())
+
+    def shutdown(self):
+        """Reject new sends, cancel whatever is still running and close the connection pool"""
+        with self._lock:
+            self._closed = True
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._lock:
+            tenants = {tenant_id: {"pending": self._tenant_pending.get(tenant_id, 0),
+                                   "rejected": self._tenant_rejected.get(tenant_id, 0)}
+                       for tenant_id in set(self._tenant_pending) | set(self._tenant_rejected)}
+        return {
+            "engine": "async",
+            "pending": self._pending,
+            "rejected": self.rejected,
+            "max_in_flight": self.max_in_flight,
+            "tenant_in_flight": self.tenant_in_flight,
+            "max_connections": self.max_connections,
+            "max_pending": self.max_pending,
+            "tenant_max_pending": self.tenant_max_pending,
+            "tenants": tenants
+        }
+
+
+def build_send_engine(engine: str = SEND_ENGINE) -> AsyncSendEngine:
+    """AsyncSendEngine when AISENSY_SEND_ENGINE=async, else None (threaded tenant pools)"""
+    if engine != "async":
+        return None
+    if aiohttp is None:
+        logger.error("AISENSY_SEND_ENGINE=async but aiohttp is not installed; using threaded send pools")
+        return None
+    return AsyncSendEngine()
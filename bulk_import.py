@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Bulk Booking Import
+Schedules reminders for many bookings in one store write (calendar migrations, outage recovery)
+
+Input is either NDJSON (one Brevo webhook payload per line, or records from
+`python payload_archive.py list`) or CSV with the columns:
+
+    email, first_name, last_name, phone, meeting_start_timestamp, meeting_url, meeting_name
+
+Every row goes through MeetingConfirmation.extract_webhook_data, exactly like
+a POST to /webhook, and is deduplicated in memory before the batch write.
+
+Usage:
+    python bulk_import.py bookings.csv --skip-confirmations
+    python bulk_import.py recovered.ndjson --tenant sales
+"""
+
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+
+import meeting_confirmation
+from meeting_confirmation import compute_webhook_id, confirmation_handler, reminder_store, tenant_registry
+from reminder_store import booking_keys
+
+logger = logging.getLogger(__name__)
+
+
+def csv_row_to_webhook(row: dict) -> dict:
+    """Shape a CSV row like a direct-format Brevo webhook"""
+    return {
+        "email": row.get("email", ""),
+        "attributes": {"SMS": row.get("phone", "")},
+        "params": {
+            "meeting_url": row.get("meeting_url") or None,
+            "meeting_name": row.get("meeting_name") or "Meeting",
+            "meeting_start_timestamp": row.get("meeting_start_timestamp"),
+            "event_participants": [{
+                "EMAIL": row.get("email", ""),
+                "FIRSTNAME": row.get("first_name", ""),
+                "LASTNAME": row.get("last_name", "")
+            }]
+        }
+    }
+
+
+def read_bookings(path: str, file_format: str):
+    """Stream webhook payloads from a CSV or NDJSON file"""
+    with open(path, 'r', newline='') as f:
+        if file_format == "csv":
+            for row in csv.DictReader(f):
+                yield csv_row_to_webhook(row)
+            return
+
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Skipping line {line_number}: {str(e)}")
+                continue
+            # Accept payload archive records as well as raw webhook payloads
+            if "payload" in record and "webhook_id" in record:
+                record = record["payload"]
+            yield record
+
+
+def import_bookings(path: str, file_format: str, skip_confirmations: bool = False, dry_run: bool = False,
+                    tenant=None) -> dict:
+    """Extract, dedupe and schedule all bookings; returns import counters"""
+    tenant = tenant or tenant_registry.default_tenant
+    started = time.monotonic()
+    counts = {"rows": 0, "invalid": 0, "duplicates": 0, "scheduled": 0, "already_scheduled": 0,
+              "confirmations_sent": 0, "confirmations_failed": 0}
+    seen_webhooks = set()
+    seen_bookings = set()
+    pending = []
+
+    for webhook_data in read_bookings(path, file_format):
+        counts["rows"] += 1
+        webhook_id = compute_webhook_id(webhook_data)
+        if webhook_id in seen_webhooks:
+            counts["duplicates"] += 1
+            continue
+        seen_webhooks.add(webhook_id)
+
+        if confirmation_handler._detect_booking_event(webhook_data) != "created":
+            counts["invalid"] += 1
+            continue
+
+        meeting_data = confirmation_handler.extract_webhook_data(webhook_data)
+        if not meeting_data or not meeting_data["phone"] or not meeting_data["meeting_datetime"]:
+            counts["invalid"] += 1
+            continue
+
+        keys = booking_keys(meeting_data["email"], meeting_data["phone"], meeting_data["meeting_datetime"],
+                            tenant.tenant_id)
+        if any(key in seen_bookings for key in keys):
+            counts["duplicates"] += 1
+            continue
+        seen_bookings.update(keys)
+
+        reminder = confirmation_handler.build_reminder(
+            webhook_id, meeting_data["phone"], meeting_data["name"], meeting_data["meeting_datetime"],
+            meeting_data["meeting_link"], meeting_data["email"], tenant.tenant_id
+        )
+        pending.append((reminder, meeting_data))
+
+    # One locked read-modify-write for the whole batch
+    scheduled = []
+    if not dry_run:
+        with reminder_store.transaction() as store:
+            for reminder, meeting_data in pending:
+                if store.find_booking(reminder["email"], reminder["phone"], reminder["meeting_datetime"],
+                                      tenant.tenant_id) \
+                        or not store.add(reminder):
+                    counts["already_scheduled"] += 1
+                    continue
+                scheduled.append((reminder["webhook_id"], meeting_data))
+        counts["scheduled"] = len(scheduled)
+
+    if not skip_confirmations:
+        for webhook_id, meeting_data in scheduled:
+            sent = confirmation_handler.send_confirmation_message(
+                meeting_data["phone"], meeting_data["name"], meeting_data["date"], meeting_data["time"],
+                meeting_data["meeting_link"], webhook_id, tenant
+            )
+            counts["confirmations_sent" if sent else "confirmations_failed"] += 1
+
+    elapsed = time.monotonic() - started
+    counts["seconds"] = round(elapsed, 3)
+    counts["rows_per_second"] = round(counts["rows"] / elapsed, 1) if elapsed else counts["rows"]
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import bookings and schedule their reminders")
+    parser.add_argument("path", help="CSV or NDJSON file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Input format (default: from file extension)")
+    parser.add_argument("--skip-confirmations", action="store_true", help="Schedule reminders without sending confirmations")
+    parser.add_argument("--dry-run", action="store_true", help="Extract and dedupe only, write nothing")
+    parser.add_argument("--verbose", action="store_true", help="Keep per-row extraction logging")
+    parser.add_argument("--tenant", help="Tenant id from the tenant config (default tenant if omitted)")
+    args = parser.parse_args(argv)
+
+    tenant = tenant_registry.get(args.tenant)
+    if tenant is None:
+        print(f"Unknown tenant: {args.tenant}", file=sys.stderr)
+        return 2
+
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    if not args.verbose:
+        # Per-row extraction logging would dominate the import time
+        meeting_confirmation.logger.setLevel(logging.WARNING)
+
+    counts = import_bookings(args.path, file_format, args.skip_confirmations, args.dry_run, tenant)
+    print(json.dumps(counts, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
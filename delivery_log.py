@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Delivery Log
+Tracks AISensy sends and WhatsApp delivery receipts by provider message ID
+
+Sends and receipts are appended to an NDJSON journal shared by the webhook and
+reminder services. Each process replays the journal into a message_id -> state
+index and afterwards only reads bytes appended since its last refresh, so
+recording a receipt is one append plus one dict lookup.
+
+CLI:
+    python delivery_log.py reconcile --older-than-minutes 30
+    python delivery_log.py get <message_id>
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from file_lock import file_lock
+
+DELIVERY_LOG_FILE = os.environ.get("DELIVERY_LOG_FILE", "message_deliveries.ndjson")
+RECEIPT_TIMEOUT_MINUTES = float(os.environ.get("RECEIPT_TIMEOUT_MINUTES", "30"))
+
+# Later states win; a late receipt still upgrades a send flagged as no_receipt
+STATUS_RANK = {"sent": 0, "no_receipt": 1, "delivered": 2, "read": 3, "failed": 4}
+STATUS_ALIASES = {"seen": "read", "undelivered": "failed", "error": "failed", "submitted": "sent", "queued": "sent"}
+
+logger = logging.getLogger(__name__)
+
+
+def extract_message_id(response_body: dict) -> str:
+    """Provider message ID from an AISensy campaign API response"""
+    if not isinstance(response_body, dict):
+        return None
+    for key in ("submitted_message_id", "messageId", "message_id", "id"):
+        if response_body.get(key):
+            return str(response_body[key])
+    data = response_body.get("data")
+    return extract_message_id(data) if isinstance(data, dict) else None
+
+
+def normalize_status(status: str) -> str:
+    status = str(status or "").strip().lower()
+    status = STATUS_ALIASES.get(status, status)
+    return status if status in STATUS_RANK else None
+
+
+class DeliveryLog:
+    def __init__(self, path: str = DELIVERY_LOG_FILE):
+        """Initialize the log; the journal is replayed lazily on first access"""
+        self.path = path
+        self._messages = {}
+        self._awaiting_receipt = set()
+        self._offset = 0
+        self._lock = threading.RLock()
+
+    def _refresh(self):
+        """Apply journal lines appended since the last refresh"""
+        try:
+            if os.path.getsize(self.path) < self._offset:
+                # Journal was rotated or truncated; replay from scratch
+                self._messages, self._awaiting_receipt, self._offset = {}, set(), 0
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    self._offset += len(line)
+                    try:
+                        self._apply(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping corrupt delivery log line: {line[:80]!r}")
+        except FileNotFoundError:
+            pass
+
+    def _apply(self, event: dict):
+        message_id = event.get("message_id")
+        if event.get("event") == "send":
+            self._messages[message_id] = {
+                "message_id": message_id,
+                "kind": event.get("kind"),
+                "webhook_id": event.get("webhook_id"),
+                "phone": event.get("phone"),
+                "sent_at": event.get("at"),
+                "status": "sent",
+                "status_at": event.get("at")
+            }
+            self._awaiting_receipt.add(message_id)
+            return
+
+        message = self._messages.get(message_id)
+        status = normalize_status(event.get("status"))
+        if message is None or status is None:
+            return
+        if STATUS_RANK[status] >= STATUS_RANK[message["status"]]:
+            message["status"] = status
+            message["status_at"] = event.get("at")
+        if status != "sent":
+            self._awaiting_receipt.discard(message_id)
+
+    def _append(self, event: dict):
+        with self._lock, file_lock(self.path):
+            self._refresh()
+            line = (json.dumps(event, separators=(',', ':')) + "\n").encode()
+            with open(self.path, 'ab') as f:
+                f.write(line)
+            self._offset += len(line)
+            self._apply(event)
+
+    def record_send(self, message_id: str, kind: str, phone: str, webhook_id: str = None):
+        """Remember a message accepted by AISensy so its receipts can be matched"""
+        if not message_id:
+            logger.warning(f"AISensy response had no message ID for {kind} to {phone}; delivery cannot be tracked")
+            return
+        try:
+            self._append({"event": "send", "message_id": message_id, "kind": kind, "phone": phone,
+                          "webhook_id": webhook_id, "at": datetime.now().isoformat()})
+        except Exception as e:
+            # The message already went out; never turn a logging failure into a failed send
+            logger.error(f"Error recording {kind} send {message_id}: {str(e)}")
+
+    def record_receipt(self, message_id: str, status: str, at: str = None) -> dict:
+        """Apply a delivery receipt; returns the updated message or None if the ID is unknown"""
+        normalized = normalize_status(status)
+        with self._lock:
+            self._refresh()
+            if message_id not in self._messages or normalized is None:
+                return None
+            self._append({"event": "receipt", "message_id": message_id, "status": normalized,
+                          "at": at or datetime.now().isoformat()})
+            return dict(self._messages[message_id])
+
+    def get(self, message_id: str) -> dict:
+        with self._lock:
+            self._refresh()
+            message = self._messages.get(message_id)
+            return dict(message) if message else None
+
+    def reconcile(self, older_than_minutes: float = RECEIPT_TIMEOUT_MINUTES) -> list:
+        """Flag sends with no receipt after the timeout; each send is reported once"""
+        cutoff = datetime.fromtimestamp(time.time() - older_than_minutes * 60).isoformat()
+        with self._lock:
+            self._refresh()
+            stale = [dict(self._messages[message_id]) for message_id in self._awaiting_receipt
+                     if self._messages[message_id]["sent_at"] < cutoff]
+            for message in stale:
+                self._append({"event": "receipt", "message_id": message["message_id"], "status": "no_receipt",
+                              "at": datetime.now().isoformat()})
+        for message in stale:
+            logger.warning(f"No delivery receipt for {message['kind']} {message['message_id']} to {message['phone']} "
+                           f"sent at {message['sent_at']}")
+        return stale
+
+
+def parse_receipts(payload) -> list:
+    """(message_id, status, timestamp) tuples from an AISensy status webhook body"""
+    events = payload if isinstance(payload, list) else [payload]
+    receipts = []
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        data = event.get("data") if isinstance(event.get("data"), dict) else event
+        message = data.get("message") if isinstance(data.get("message"), dict) else data
+        message_id = None
+        for key in ("messageId", "message_id", "submitted_message_id", "id"):
+            if message.get(key):
+                message_id = str(message[key])
+                break
+        status = message.get("status") or message.get("delivery_status") or event.get("status")
+        timestamp = message.get("timestamp") or event.get("timestamp")
+        if message_id and status:
+            receipts.append((message_id, status, str(timestamp) if timestamp else None))
+    return receipts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect AISensy delivery receipts")
+    parser.add_argument("--file", default=DELIVERY_LOG_FILE, help="Delivery journal")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reconcile_parser = subparsers.add_parser("reconcile", help="Flag sends without a receipt")
+    reconcile_parser.add_argument("--older-than-minutes", type=float, default=RECEIPT_TIMEOUT_MINUTES)
+    get_parser = subparsers.add_parser("get", help="Show one message by provider ID")
+    get_parser.add_argument("message_id")
+
+    args = parser.parse_args(argv)
+    delivery_log = DeliveryLog(args.file)
+
+    if args.command == "get":
+        message = delivery_log.get(args.message_id)
+        print(json.dumps(message, indent=2) if message else f"Unknown message ID {args.message_id}")
+        return 0 if message else 1
+
+    stale = delivery_log.reconcile(args.older_than_minutes)
+    for message in stale:
+        print(json.dumps(message, separators=(',', ':')))
+    print(f"{len(stale)} sends without a receipt after {args.older_than_minutes:g} minutes", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
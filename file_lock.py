@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Inter-process File Locking
+Advisory flock helper for state files shared by the webhook and reminder services
+"""
+
+import contextlib
+import fcntl
+
+
+@contextlib.contextmanager
+def file_lock(path: str, shared: bool = False):
+    """Hold an exclusive (or shared) lock on path + '.lock' for the duration of the block"""
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Raw Webhook Payload Archive
+Stores incoming webhook payloads as gzip-compressed NDJSON segments
+
+Every payload is written as its own gzip member, so a single webhook can be
+read back by seeking to its offset and decompressing only that member. An
+append-only index (index.ndjson) maps webhook_id and receive time to
+(segment, offset, length) and is loaded into memory on startup.
+
+CLI:
+    python payload_archive.py get <webhook_id>
+    python payload_archive.py list --from 2025-06-10T00:00:00 --to 2025-06-11T00:00:00
+    python payload_archive.py replay --url http://localhost:8002/webhook --rate 20 --secret "$BREVO_WEBHOOK_SECRET"
+
+Replay signs each body with --secret (HMAC-SHA256 in X-Webhook-Signature, as
+the request guard expects) and sends everything from one IP, so replaying
+faster than about 2/s needs the target started with RATE_LIMIT_PER_MINUTE=0
+(the per-IP limiter otherwise answers 429).
+"""
+
+import argparse
+import bisect
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+ARCHIVE_DIR = os.environ.get("WEBHOOK_ARCHIVE_DIR", "webhook_archive")
+ARCHIVE_SEGMENT_MAX_BYTES = int(os.environ.get("WEBHOOK_ARCHIVE_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+INDEX_FILE_NAME = "index.ndjson"
+
+logger = logging.getLogger(__name__)
+
+
+class PayloadArchive:
+    def __init__(self, archive_dir: str = ARCHIVE_DIR, segment_max_bytes: int = ARCHIVE_SEGMENT_MAX_BYTES):
+        """Open (or create) the archive and load its offset index"""
+        self.archive_dir = archive_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.index_path = os.path.join(archive_dir, INDEX_FILE_NAME)
+        self._by_id = {}
+        self._timeline = []
+        self._segment_number = 1
+        self._lock = threading.Lock()
+
+        os.makedirs(archive_dir, exist_ok=True)
+        self._load_index()
+
+    def _segment_name(self, number: int) -> str:
+        return f"segment-{number:06d}.ndjson.gz"
+
+    def _load_index(self):
+        """Rebuild the in-memory id and time indexes from index.ndjson"""
+        if not os.path.exists(self.index_path):
+            return
+
+        with open(self.index_path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write; the payload itself is unreachable
+                    logger.warning(f"Skipping corrupt archive index line: {line[:80]!r}")
+                    continue
+                self._index_entry(entry)
+
+        if self._timeline:
+            last_segment = max(entry["segment"] for entry in self._by_id.values())
+            self._segment_number = int(last_segment.split("-")[1].split(".")[0])
+        logger.info(f"Loaded payload archive index: {len(self._by_id)} payloads in {self.archive_dir}")
+
+    def _index_entry(self, entry: dict):
+        self._by_id[entry["webhook_id"]] = entry
+        bisect.insort(self._timeline, (entry["ts"], entry["webhook_id"]))
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, webhook_id: str) -> bool:
+        return webhook_id in self._by_id
+
+    def append(self, webhook_id: str, payload: dict, received_at: float = None) -> dict:
+        """Compress and append one payload; returns its index entry (existing one if already archived)"""
+        received_at = received_at if received_at is not None else time.time()
+        record = {
+            "webhook_id": webhook_id,
+            "received_at": datetime.fromtimestamp(received_at).isoformat(),
+            "payload": payload
+        }
+        member = gzip.compress((json.dumps(record, separators=(',', ':')) + "\n").encode(), compresslevel=6)
+
+        with self._lock:
+            if webhook_id in self._by_id:
+                return self._by_id[webhook_id]
+
+            segment = self._segment_name(self._segment_number)
+            segment_path = os.path.join(self.archive_dir, segment)
+            if os.path.exists(segment_path) and os.path.getsize(segment_path) + len(member) > self.segment_max_bytes:
+                self._segment_number += 1
+                segment = self._segment_name(self._segment_number)
+                segment_path = os.path.join(self.archive_dir, segment)
+
+            with open(segment_path, 'ab') as f:
+                offset = f.tell()
+                f.write(member)
+
+            entry = {
+                "webhook_id": webhook_id,
+                "ts": received_at,
+                "segment": segment,
+                "offset": offset,
+                "length": len(member)
+            }
+            with open(self.index_path, 'a') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + "\n")
+
+            self._index_entry(entry)
+            return entry
+
+    def _read_entry(self, entry: dict) -> dict:
+        with open(os.path.join(self.archive_dir, entry["segment"]), 'rb') as f:
+            f.seek(entry["offset"])
+            return json.loads(gzip.decompress(f.read(entry["length"])))
+
+    def get(self, webhook_id: str) -> dict:
+        """Return the archived record ({webhook_id, received_at, payload}) or None"""
+        entry = self._by_id.get(webhook_id)
+        if not entry:
+            return None
+        return self._read_entry(entry)
+
+    def iter_range(self, start: float = None, end: float = None):
+        """Yield archived records received in [start, end) in receive order"""
+        low = bisect.bisect_left(self._timeline, (start,)) if start is not None else 0
+        high = bisect.bisect_left(self._timeline, (end,)) if end is not None else len(self._timeline)
+        for ts, webhook_id in self._timeline[low:high]:
+            yield self._read_entry(self._by_id[webhook_id])
+
+
+def _parse_time(value: str) -> float:
+    """Accept ISO datetimes or epoch seconds on the command line"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def replay(archive: PayloadArchive, url: str, start: float = None, end: float = None, rate: float = 0,
+           secret: str = None) -> int:
+    """POST archived payloads back to a webhook URL, optionally rate limited (requests/sec) and HMAC-signed"""
+    import requests
+
+    sent = 0
+    failed = 0
+    rate_limited = 0
+    interval = 1.0 / rate if rate > 0 else 0
+    started = time.monotonic()
+    for record in archive.iter_range(start, end):
+        if interval:
+            delay = started + sent * interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        body = json.dumps(record["payload"]).encode()
+        headers = {"Content-Type": "application/json"}
+        if secret:
+            # Signed over the exact bytes sent, as verify_signature checks them
+            headers["X-Webhook-Signature"] = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        try:
+            response = requests.post(url, data=body, headers=headers, timeout=30)
+            if response.status_code >= 400:
+                failed += 1
+                rate_limited += response.status_code == 429
+        except Exception as e:
+            logger.error(f"Error replaying {record['webhook_id']}: {str(e)}")
+            failed += 1
+        sent += 1
+
+    elapsed = time.monotonic() - started
+    print(f"Replayed {sent} payloads to {url} in {elapsed:.1f}s ({sent / elapsed if elapsed else 0:.1f}/s), {failed} failed")
+    if rate_limited:
+        print(f"{rate_limited} rejected by the per-IP rate limit; start the target with RATE_LIMIT_PER_MINUTE=0 "
+              f"for load tests", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and replay the raw webhook payload archive")
+    parser.add_argument("--dir", default=ARCHIVE_DIR, help="Archive directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    get_parser = subparsers.add_parser("get", help="Print one payload by webhook_id")
+    get_parser.add_argument("webhook_id")
+
+    for name, help_text in (("list", "Print payloads as NDJSON"), ("replay", "POST payloads to a webhook URL")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--from", dest="start", help="Start time (ISO or epoch seconds)")
+        sub.add_argument("--to", dest="end", help="End time (ISO or epoch seconds)")
+        if name == "replay":
+            sub.add_argument("--url", required=True, help="Webhook URL to replay against")
+            sub.add_argument("--rate", type=float, default=0,
+                             help="Requests per second (0 = unlimited); above ~2/s the target needs RATE_LIMIT_PER_MINUTE=0")
+            sub.add_argument("--secret", default=os.environ.get("BREVO_WEBHOOK_SECRET"),
+                             help="Webhook secret to sign each body with (default: BREVO_WEBHOOK_SECRET)")
+
+    args = parser.parse_args(argv)
+    archive = PayloadArchive(args.dir)
+
+    if args.command == "get":
+        record = archive.get(args.webhook_id)
+        if record is None:
+            print(f"No archived payload for {args.webhook_id}", file=sys.stderr)
+            return 1
+        print(json.dumps(record, indent=2))
+        return 0
+
+    start, end = _parse_time(args.start), _parse_time(args.end)
+    if args.command == "list":
+        for record in archive.iter_range(start, end):
+            print(json.dumps(record, separators=(',', ':')))
+        return 0
+
+    return replay(archive, args.url, start, end, args.rate, args.secret)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Sampled Profiling Hooks
+Opt-in cProfile sampling for the webhook and scheduler hot paths
+
+Enable with PROFILE_SAMPLE_RATE=N to profile 1 in N calls of each decorated
+function (0 disables). A profile covers only the thread that made the call, so
+work handed to a pool or event loop needs its own decorated entry point.
+Profiles are written as rotating pstats files to PROFILE_DIR and can be
+aggregated into a flamegraph-ready summary with:
+
+    python profiling.py summarize --dir profiles --collapsed stacks.txt
+"""
+
+import argparse
+import cProfile
+import functools
+import glob
+import itertools
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+PROFILE_SAMPLE_RATE = int(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "200"))
+# Upper bound for max_files changed at runtime, so the admin endpoint cannot fill the disk
+PROFILE_MAX_FILES_LIMIT = 1000
+
+# One profile at a time per process: since Python 3.12 cProfile is process-wide (sys.monitoring)
+# and a second profiler on another thread raises ValueError
+_profiling_active = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+class SampledProfiler:
+    def __init__(self, sample_rate: int = PROFILE_SAMPLE_RATE, output_dir: str = PROFILE_DIR,
+                 max_files: int = PROFILE_MAX_FILES):
+        """Initialize the sampled profiler (disabled when sample_rate is 0)"""
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.max_files = max_files
+        self.profiles_written = 0
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def configure(self, sample_rate: int = None, max_files: int = None) -> dict:
+        """Change sampling at runtime (used by the admin endpoint)"""
+        if sample_rate is not None:
+            self.sample_rate = max(0, int(sample_rate))
+        if max_files is not None:
+            self.max_files = min(max(1, int(max_files)), PROFILE_MAX_FILES_LIMIT)
+        logger.info(f"Profiling configured: 1 in {self.sample_rate} calls, keeping {self.max_files} files")
+        return self.status()
+
+    def status(self) -> dict:
+        """Current profiler settings"""
+        return {
+            "enabled": self.sample_rate > 0,
+            "sample_rate": self.sample_rate,
+            "output_dir": self.output_dir,
+            "max_files": self.max_files,
+            "profiles_written": self.profiles_written
+        }
+
+    def profile(self, label: str):
+        """Decorator that profiles 1 in sample_rate calls of the wrapped function"""
+        def decorator(func):
+            # Counted per function, so a frequent label cannot starve a rare one of samples
+            counter = itertools.count()
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                # Skip the sample rather than wait when another call is being profiled
+                if not self._should_sample(counter) or not _profiling_active.acquire(blocking=False):
+                    return func(*args, **kwargs)
+
+                profile = cProfile.Profile()
+                try:
+                    return profile.runcall(func, *args, **kwargs)
+                finally:
+                    _profiling_active.release()
+                    self._write_profile(label, profile)
+            return wrapper
+        return decorator
+
+    def _should_sample(self, counter) -> bool:
+        """Cheap 1-in-N check"""
+        rate = self.sample_rate
+        if rate <= 0:
+            return False
+        return next(counter) % rate == 0
+
+    def _write_profile(self, label: str, profile: cProfile.Profile):
+        """Dump a profile and drop the oldest files beyond max_files"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            filename = f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._sequence)}.prof"
+            profile.dump_stats(os.path.join(self.output_dir, filename))
+
+            with self._lock:
+                self.profiles_written += 1
+                files = sorted(glob.glob(os.path.join(self.output_dir, "*.prof")), key=os.path.getmtime)
+                for old_file in files[:max(0, len(files) - self.max_files)]:
+                    os.remove(old_file)
+        except Exception as e:
+            logger.error(f"Error writing profile for {label}: {str(e)}")
+
+
+def _func_label(func) -> str:
+    """Render a pstats function key as file:function:line"""
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{name}:{line}"
+
+
+def collapsed_stacks(stats: pstats.Stats, max_depth: int = 64) -> Counter:
+    """Approximate collapsed stacks (in microseconds) from pstats caller edges"""
+    callees = defaultdict(dict)
+    roots = []
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]
+
+    stacks = Counter()
+
+    def walk(func, path, seen, budget):
+        tt, ct = stats.stats[func][2], stats.stats[func][3]
+        scale = budget / ct if ct else 0.0
+        path = path + [_func_label(func)]
+        self_us = int(tt * scale * 1_000_000)
+        if self_us > 0:
+            stacks[";".join(path)] += self_us
+        if len(path) >= max_depth:
+            return
+        for callee, edge_ct in callees[func].items():
+            child_budget = edge_ct * scale
+            if callee in seen or child_budget < 1e-6:
+                continue
+            walk(callee, path, seen | {callee}, child_budget)
+
+    for root in roots:
+        walk(root, [], {root}, stats.stats[root][3])
+    return stacks
+
+
+def summarize(profile_dir: str, label: str = None, top: int = 25, collapsed_path: str = None) -> int:
+    """Aggregate profile files into a top-N table and optional collapsed-stack file"""
+    pattern = f"{label}-*.prof" if label else "*.prof"
+    files = sorted(glob.glob(os.path.join(profile_dir, pattern)))
+    if not files:
+        print(f"No profiles matching {pattern} in {profile_dir}")
+        return 1
+
+    stats = pstats.Stats(*files, stream=sys.stdout)
+    print(f"Aggregated {len(files)} profiles from {profile_dir}")
+    stats.sort_stats("cumulative").print_stats(top)
+
+    if collapsed_path:
+        stacks = collapsed_stacks(stats)
+        with open(collapsed_path, "w") as f:
+            for stack, weight in stacks.most_common():
+                f.write(f"{stack} {weight}\n")
+        print(f"Wrote {len(stacks)} collapsed stacks to {collapsed_path} (feed to flamegraph.pl)")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Aggregate sampled profiles")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    summary_parser = subparsers.add_parser("summarize", help="Aggregate pstats files")
+    summary_parser.add_argument("--dir", default=PROFILE_DIR, help="Profile directory")
+    summary_parser.add_argument("--label", help="Only include profiles for this label (e.g. webhook, scheduler_tick)")
+    summary_parser.add_argument("--top", type=int, default=25, help="Number of functions to print")
+    summary_parser.add_argument("--collapsed", help="Write flamegraph collapsed stacks to this file")
+
+    args = parser.parse_args(argv)
+    return summarize(args.dir, args.label, args.top, args.collapsed)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Shared AISensy Quota Governor
+Token bucket shared by the webhook and reminder services through a local state file
+
+Both processes send with the same AISensy API key, so they draw from one
+bucket. Confirmations have priority: reminders may not dip into the reserved
+part of the bucket and back off while a confirmation is waiting for a token.
+
+CLI:
+    python quota_governor.py status
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from file_lock import file_lock
+
+AISENSY_RATE_PER_SECOND = float(os.environ.get("AISENSY_RATE_PER_SECOND", "5"))
+AISENSY_BURST = float(os.environ.get("AISENSY_BURST", "20"))
+AISENSY_QUOTA_STATE_FILE = os.environ.get("AISENSY_QUOTA_STATE_FILE", "aisensy_quota.json")
+
+# Priority classes, highest first
+PRIORITY_CONFIRMATION = "confirmation"
+PRIORITY_REMINDER = "reminder"
+
+# Share of the bucket each class must leave untouched for higher classes
+PRIORITY_RESERVE_FRACTION = {
+    PRIORITY_CONFIRMATION: 0.0,
+    PRIORITY_REMINDER: float(os.environ.get("AISENSY_REMINDER_RESERVE_FRACTION", "0.3"))
+}
+
+# How long each class waits for a token before giving up
+PRIORITY_WAIT_SECONDS = {
+    PRIORITY_CONFIRMATION: float(os.environ.get("AISENSY_CONFIRMATION_QUOTA_WAIT", "10")),
+    PRIORITY_REMINDER: float(os.environ.get("AISENSY_REMINDER_QUOTA_WAIT", "5"))
+}
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaGovernor:
+    def __init__(self, state_file: str = AISENSY_QUOTA_STATE_FILE, rate: float = AISENSY_RATE_PER_SECOND,
+                 burst: float = AISENSY_BURST):
+        """Initialize the governor; the state file is created on first use"""
+        self.state_file = state_file
+        self.rate = rate
+        self.burst = burst
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"tokens": self.burst, "updated_at": time.time(), "priority_waiting_until": 0,
+                    "granted": {}, "denied": {}}
+
+    def _save_state(self, state: dict):
+        with open(self.state_file, 'w') as f:
+            json.dump(state, f)
+
+    def _refill(self, state: dict, now: float):
+        elapsed = max(0.0, now - state["updated_at"])
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * self.rate)
+        state["updated_at"] = now
+
+    def acquire(self, priority: str = PRIORITY_CONFIRMATION, timeout: float = None) -> bool:
+        """Take one send token, waiting up to timeout seconds; False if the budget is exhausted"""
+        deadline = self._deadline(priority, timeout)
+        while True:
+            granted, wait = self._try_take(priority, deadline)
+            if granted is not None:
+                return granted
+            time.sleep(wait)
+
+    async def acquire_async(self, priority: str = PRIORITY_CONFIRMATION, timeout: float = None) -> bool:
+        """acquire() for the async send engine: the locked state-file access runs in a worker thread
+        and the wait happens on the event loop"""
+        deadline = self._deadline(priority, timeout)
+        while True:
+            granted, wait = await asyncio.to_thread(self._try_take, priority, deadline)
+            if granted is not None:
+                return granted
+            await asyncio.sleep(wait)
+
+    def _deadline(self, priority: str, timeout: float) -> float:
+        timeout = PRIORITY_WAIT_SECONDS.get(priority, 0) if timeout is None else timeout
+        return time.time() + timeout
+
+    def _try_take(self, priority: str, deadline: float) -> tuple:
+        """One locked attempt: (True, 0) granted, (False, 0) denied, (None, wait) retry after wait seconds"""
+        reserve = PRIORITY_RESERVE_FRACTION.get(priority, 0.0) * self.burst
+        with file_lock(self.state_file):
+            now = time.time()
+            state = self._load_state()
+            self._refill(state, now)
+
+            # Lower classes yield while a confirmation is queued for a token
+            blocked = reserve > 0 and now < state.get("priority_waiting_until", 0)
+            if not blocked and state["tokens"] - 1 >= reserve:
+                state["tokens"] -= 1
+                state["granted"][priority] = state["granted"].get(priority, 0) + 1
+                self._save_state(state)
+                return True, 0
+
+            wait = max(0.01, (reserve + 1 - state["tokens"]) / self.rate)
+            if now + wait > deadline:
+                state["denied"][priority] = state["denied"].get(priority, 0) + 1
+                self._save_state(state)
+                logger.warning(f"AISensy quota exhausted for {priority} send ({state['tokens']:.1f} tokens left)")
+                return False, 0
+
+            if reserve == 0:
+                state["priority_waiting_until"] = max(state.get("priority_waiting_until", 0), now + wait)
+            self._save_state(state)
+        return None, wait
+
+    def snapshot(self) -> dict:
+        """Current budget usage for stats endpoints and the CLI"""
+        with file_lock(self.state_file, shared=True):
+            state = self._load_state()
+        self._refill(state, time.time())
+        return {
+            "state_file": self.state_file,
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tokens_available": round(state["tokens"], 2),
+            "utilization": round(1 - state["tokens"] / self.burst, 3) if self.burst else 0,
+            "reserve_fraction": PRIORITY_RESERVE_FRACTION,
+            "granted": state["granted"],
+            "denied": state["denied"]
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect the shared AISensy quota")
+    parser.add_argument("command", choices=["status"])
+    parser.add_argument("--state-file", default=AISENSY_QUOTA_STATE_FILE, help="Shared quota state file")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(QuotaGovernor(args.state_file).snapshot(), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
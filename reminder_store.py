@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Reminder Store
+Shared access to meeting_reminders.json with in-memory secondary indexes
+
+The file stays a plain JSON list so both services (and operators) can read it.
+Each process keeps the parsed list cached and rebuilds its indexes only when
+the file changes on disk; writes happen inside a flock-protected transaction.
+
+Indexes:
+- webhook_id -> reminder
+- (tenant_id, email, meeting_datetime) and (tenant_id, phone, meeting_datetime)
+  -> reminder, for locating a booking from a Brevo reschedule/cancel event
+- sorted (meeting_datetime, webhook_id) timeline for time-range queries
+
+SentJournal is the scheduler's cheap per-send record: one appended line per
+sent reminder, folded into the JSON file in a single transaction per tick.
+"""
+
+import base64
+import bisect
+import contextlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+from file_lock import file_lock
+from tenants import DEFAULT_TENANT_ID
+
+REMINDERS_JSON_FILE = "meeting_reminders.json"
+# Timeline entries one query() call may examine; a selective status filter gets a cursor instead of a full scan
+QUERY_MAX_SCAN = 5000
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_phone(phone: str) -> str:
+    """Digits only, so '+91 98...' and '9198...' index the same"""
+    return "".join(ch for ch in str(phone) if ch.isdigit())
+
+
+def reminder_status(reminder: dict) -> str:
+    """One of 'cancelled', 'sent', 'missed' or 'pending'"""
+    if reminder.get('cancelled'):
+        return "cancelled"
+    if reminder.get('reminder_sent'):
+        return "sent"
+    if reminder.get('reminder_missed'):
+        return "missed"
+    return "pending"
+
+
+def encode_cursor(timeline_key: tuple) -> str:
+    return base64.urlsafe_b64encode("|".join(timeline_key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        meeting_datetime, webhook_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return (meeting_datetime, webhook_id)
+
+
+def booking_keys(email: str, phone: str, meeting_datetime, tenant_id: str = DEFAULT_TENANT_ID) -> list:
+    """Secondary index keys for a booking (tenant + participant contact + meeting start)"""
+    if isinstance(meeting_datetime, datetime):
+        meeting_datetime = meeting_datetime.isoformat()
+    tenant_id = tenant_id or DEFAULT_TENANT_ID
+    keys = []
+    if email:
+        keys.append((tenant_id, "email", email.strip().lower(), meeting_datetime))
+    if phone and normalize_phone(phone):
+        keys.append((tenant_id, "phone", normalize_phone(phone), meeting_datetime))
+    return keys
+
+
+class ReminderStore:
+    def __init__(self, path: str = REMINDERS_JSON_FILE):
+        """Initialize the store; the file is read lazily on first access"""
+        self.path = path
+        self._reminders = []
+        self._by_webhook_id = {}
+        self._by_booking = {}
+        self._timeline = []
+        self._file_signature = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        """Reload and reindex only if the file changed since the last read"""
+        signature = self._signature()
+        if signature == self._file_signature:
+            return
+
+        reminders = []
+        if signature is not None:
+            with open(self.path, 'r') as f:
+                reminders = json.load(f)
+
+        self._reminders = reminders
+        self._file_signature = signature
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        self._by_webhook_id = {}
+        self._by_booking = {}
+        for reminder in self._reminders:
+            self._index(reminder)
+        self._timeline = sorted(self._timeline_key(reminder) for reminder in self._by_webhook_id.values())
+
+    def _timeline_key(self, reminder: dict) -> tuple:
+        return (reminder.get('meeting_datetime') or "", reminder['webhook_id'])
+
+    def _timeline_remove(self, reminder: dict):
+        key = self._timeline_key(reminder)
+        position = bisect.bisect_left(self._timeline, key)
+        if position < len(self._timeline) and self._timeline[position] == key:
+            del self._timeline[position]
+
+    def _index(self, reminder: dict):
+        if reminder.get('webhook_id'):
+            self._by_webhook_id[reminder['webhook_id']] = reminder
+        if reminder.get('cancelled'):
+            return
+        for key in booking_keys(reminder.get('email'), reminder.get('phone'), reminder.get('meeting_datetime'),
+                                reminder.get('tenant_id')):
+            self._by_booking[key] = reminder
+
+    def _unindex_booking(self, reminder: dict):
+        for key in booking_keys(reminder.get('email'), reminder.get('phone'), reminder.get('meeting_datetime'),
+                                reminder.get('tenant_id')):
+            if self._by_booking.get(key) is reminder:
+                del self._by_booking[key]
+
+    def _write(self):
+        """Atomic checkpoint: a crash mid-write leaves the previous file intact"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self._reminders, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._file_signature = self._signature()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Lock the file across processes, refresh, and persist changes on success
+
+        Only the mutating methods below mark the store dirty; a transaction
+        that changes nothing skips the rewrite.
+        """
+        with self._lock, file_lock(self.path):
+            self._refresh()
+            self._dirty = False
+            try:
+                yield self
+            except Exception:
+                # Drop partially applied changes; the next access rereads the file
+                self._file_signature = None
+                raise
+            if self._dirty:
+                self._write()
+                self._dirty = False
+
+    def load(self) -> list:
+        """Current reminders (cached until the file changes)"""
+        with self._lock, file_lock(self.path, shared=True):
+            self._refresh()
+            return self._reminders
+
+    def get(self, webhook_id: str) -> dict:
+        """Reminder for a webhook_id, or None (inside a transaction)"""
+        return self._by_webhook_id.get(webhook_id)
+
+    def find_booking(self, email: str, phone: str, meeting_datetime, tenant_id: str = DEFAULT_TENANT_ID) -> dict:
+        """Active reminder for a participant's meeting start within one tenant, or None (inside a transaction)"""
+        for key in booking_keys(email, phone, meeting_datetime, tenant_id):
+            reminder = self._by_booking.get(key)
+            if reminder:
+                return reminder
+        return None
+
+    def add(self, reminder: dict) -> bool:
+        """Append a reminder (inside a transaction); False if its webhook_id already exists"""
+        if reminder['webhook_id'] in self._by_webhook_id:
+            return False
+        self._reminders.append(reminder)
+        self._index(reminder)
+        bisect.insort(self._timeline, self._timeline_key(reminder))
+        self._dirty = True
+        return True
+
+    def move(self, reminder: dict, meeting_datetime: datetime, **fields):
+        """Reschedule a reminder to a new meeting time (inside a transaction)"""
+        self._unindex_booking(reminder)
+        self._timeline_remove(reminder)
+        reminder['previous_meeting_datetime'] = reminder.get('meeting_datetime')
+        reminder['meeting_datetime'] = meeting_datetime.isoformat()
+        reminder['reminder_sent'] = False
+        reminder.pop('reminder_sent_at', None)
+        reminder.pop('reminder_missed', None)
+        reminder.pop('reminder_missed_at', None)
+        reminder['rescheduled_at'] = datetime.now().isoformat()
+        reminder.update(fields)
+        self._index(reminder)
+        bisect.insort(self._timeline, self._timeline_key(reminder))
+        self._dirty = True
+
+    def cancel(self, reminder: dict):
+        """Cancel a pending reminder (inside a transaction)"""
+        self._unindex_booking(reminder)
+        reminder['cancelled'] = True
+        reminder['cancelled_at'] = datetime.now().isoformat()
+        self._dirty = True
+
+    def mark_sent(self, reminder: dict, sent_at: str) -> bool:
+        """Set the sent flag (inside a transaction); False if it was already set"""
+        if reminder.get('reminder_sent'):
+            return False
+        reminder['reminder_sent'] = True
+        reminder['reminder_sent_at'] = sent_at
+        self._dirty = True
+        return True
+
+    def mark_missed(self, reminder: dict, missed_at: str) -> bool:
+        """Flag a reminder whose send window closed unsent (inside a transaction); False if sent or already flagged"""
+        if reminder.get('reminder_sent') or reminder.get('reminder_missed'):
+            return False
+        reminder['reminder_missed'] = True
+        reminder['reminder_missed_at'] = missed_at
+        self._dirty = True
+        return True
+
+    def query(self, start: datetime = None, end: datetime = None, status: str = None, cursor: str = None,
+              limit: int = 100) -> tuple:
+        """One page of reminders ordered by meeting time in [start, end); returns (reminders, next_cursor)
+
+        With a warm cache this walks at most QUERY_MAX_SCAN timeline entries
+        from the cursor (or start); when the cap is hit the page may be short
+        (even empty) and next_cursor resumes the scan. Whenever the file has
+        changed since the last read (every send and webhook changes it) the
+        call first re-parses and re-sorts the whole file, O(n log n).
+        """
+        with self._lock, file_lock(self.path, shared=True):
+            self._refresh()
+
+            if cursor:
+                position = bisect.bisect_right(self._timeline, decode_cursor(cursor))
+            elif start is not None:
+                position = bisect.bisect_left(self._timeline, (start.isoformat(),))
+            else:
+                position = 0
+            end_key = end.isoformat() if end is not None else None
+
+            page = []
+            last_key = None
+            scanned = 0
+            while position < len(self._timeline):
+                key = self._timeline[position]
+                if end_key is not None and key[0] >= end_key:
+                    return page, None
+                if len(page) == limit or scanned == QUERY_MAX_SCAN:
+                    return page, encode_cursor(last_key) if last_key else cursor
+                position += 1
+                scanned += 1
+                last_key = key
+                reminder = self._by_webhook_id[key[1]]
+                if status and reminder_status(reminder) != status:
+                    continue
+                page.append(dict(reminder, status=reminder_status(reminder)))
+            return page, None
+
+
+class SentJournal:
+    def __init__(self, path: str):
+        """Append-only NDJSON of sent reminders awaiting a fold into the store"""
+        self.path = path
+        self._folding_path = f"{path}.folding"
+        self._lock = threading.Lock()
+
+    def append(self, webhook_id: str, sent_at: str):
+        """Record one send; the flushed line survives a process kill (the fold fsyncs the store)"""
+        line = json.dumps({"webhook_id": webhook_id, "reminder_sent_at": sent_at}) + "\n"
+        with self._lock, open(self.path, 'a') as f:
+            f.write(line)
+
+    def fold_into(self, store: ReminderStore) -> int:
+        """Apply journaled sends to the store in one transaction; returns how many flags were set"""
+        with self._lock:
+            # Appends continue into a fresh journal while this one is folded; a leftover
+            # .folding file from a crash is folded first
+            if not os.path.exists(self._folding_path):
+                if not os.path.exists(self.path):
+                    return 0
+                os.replace(self.path, self._folding_path)
+
+        entries = []
+        with open(self._folding_path, 'r') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A torn last line from a kill mid-append
+                    logger.warning(f"Skipping unreadable line in {self._folding_path}")
+
+        folded = 0
+        with store.transaction():
+            for entry in entries:
+                reminder = store.get(entry.get("webhook_id"))
+                if reminder is not None and store.mark_sent(reminder, entry.get("reminder_sent_at")):
+                    folded += 1
+        os.remove(self._folding_path)
+        return folded
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Request Guard
+Cheap pre-dispatch checks for the webhook service, run before any JSON parsing
+
+- per-IP token bucket rate limiting
+- Content-Length cap (Flask's MAX_CONTENT_LENGTH backs it up for chunked bodies)
+- shared-secret / HMAC verification of the raw body for signed endpoints; in
+  production, endpoints listed as secret-required answer 404 when unconfigured
+- debug endpoints answer 404 when APP_ENV=production
+- admin endpoints require ADMIN_API_SECRET (Bearer or X-Admin-Secret); without
+  it they answer 404 in every environment
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+
+from flask import jsonify, request
+
+APP_ENV = os.environ.get("APP_ENV", "development")
+WEBHOOK_MAX_CONTENT_LENGTH = int(os.environ.get("WEBHOOK_MAX_CONTENT_LENGTH", str(64 * 1024)))
+RATE_LIMIT_PER_MINUTE = float(os.environ.get("RATE_LIMIT_PER_MINUTE", "120"))
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "30"))
+RATE_LIMIT_MAX_CLIENTS = 10000
+ADMIN_API_SECRET = os.environ.get("ADMIN_API_SECRET")
+
+logger = logging.getLogger(__name__)
+
+
+class IPRateLimiter:
+    def __init__(self, per_minute: float = RATE_LIMIT_PER_MINUTE, burst: float = RATE_LIMIT_BURST):
+        """Token bucket per client IP (disabled when per_minute is 0)"""
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def allow(self, client_ip: str) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(client_ip, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[client_ip] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > RATE_LIMIT_MAX_CLIENTS:
+                # Forget the idle half rather than growing without bound
+                idle = sorted(self._buckets, key=lambda ip: self._buckets[ip][1])[:RATE_LIMIT_MAX_CLIENTS // 2]
+                for ip in idle:
+                    del self._buckets[ip]
+            return allowed
+
+
+def verify_signature(secret: str, body: bytes, headers) -> bool:
+    """Accept an HMAC-SHA256 of the raw body, or the shared secret as a Bearer/Basic/X-Webhook-Secret credential"""
+    signature = headers.get("X-Webhook-Signature") or headers.get("X-Brevo-Signature")
+    if signature:
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(signature.split("=", 1)[-1].strip().lower(), expected)
+
+    authorization = headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        return hmac.compare_digest(authorization[len("Bearer "):].strip(), secret)
+    if authorization.startswith("Basic ") and request.authorization:
+        return hmac.compare_digest(request.authorization.password or "", secret)
+
+    shared_secret = headers.get("X-Webhook-Secret")
+    if shared_secret:
+        return hmac.compare_digest(shared_secret, secret)
+    return False
+
+
+def verify_admin(secret: str, headers) -> bool:
+    """Admin credential as a Bearer token or X-Admin-Secret header"""
+    authorization = headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        return hmac.compare_digest(authorization[len("Bearer "):].strip(), secret)
+    return hmac.compare_digest(headers.get("X-Admin-Secret", ""), secret)
+
+
+def install_request_guard(app, signed_endpoints: dict, debug_endpoints: set, rate_limiter: IPRateLimiter = None,
+                          admin_endpoints: set = frozenset(), admin_secret: str = ADMIN_API_SECRET,
+                          secret_required_in_production: set = frozenset()):
+    """Register the guard; signed_endpoints maps endpoint name -> callable(view_args) returning the
+    accepted secret (or a list of them; None or empty skips verification, except for
+    secret_required_in_production endpoints in production, which then answer 404)"""
+    app.config['MAX_CONTENT_LENGTH'] = WEBHOOK_MAX_CONTENT_LENGTH
+    rate_limiter = rate_limiter or IPRateLimiter()
+    production = APP_ENV == "production"
+    if admin_endpoints and not admin_secret:
+        logger.warning("ADMIN_API_SECRET is not set - admin endpoints are disabled")
+
+    @app.before_request
+    def guard_request():
+        if not rate_limiter.allow(request.remote_addr or "unknown"):
+            return jsonify({"status": "error", "message": "Rate limit exceeded"}), 429
+
+        if production and request.endpoint in debug_endpoints:
+            return jsonify({"status": "error", "message": "Not found"}), 404
+
+        if request.endpoint in admin_endpoints:
+            if admin_secret:
+                if not verify_admin(admin_secret, request.headers):
+                    logger.warning(f"Rejected unauthenticated admin request to {request.path} from {request.remote_addr}")
+                    return jsonify({"status": "error", "message": "Unauthorized"}), 401
+            else:
+                # Fail closed: an unconfigured secret never means open
+                return jsonify({"status": "error", "message": "Not found"}), 404
+
+        if request.method != 'POST':
+            return None
+
+        if request.content_length is not None and request.content_length > WEBHOOK_MAX_CONTENT_LENGTH:
+            return jsonify({"status": "error", "message": "Payload too large"}), 413
+
+        secret_for = signed_endpoints.get(request.endpoint)
+        secrets = secret_for(request.view_args or {}) if secret_for else None
+        secrets = [secrets] if isinstance(secrets, str) else [secret for secret in secrets or [] if secret]
+        if secrets:
+            body = request.get_data(cache=True)
+            if not any(verify_signature(secret, body, request.headers) for secret in secrets):
+                logger.warning(f"Rejected unsigned request to {request.path} from {request.remote_addr}")
+                return jsonify({"status": "error", "message": "Invalid signature"}), 401
+        elif production and request.endpoint in secret_required_in_production:
+            return jsonify({"status": "error", "message": "Not found"}), 404
+        return None
+
+    logger.info(f"Request guard installed: env={APP_ENV}, max body {WEBHOOK_MAX_CONTENT_LENGTH} bytes, "
+                f"{RATE_LIMIT_PER_MINUTE:g} req/min per IP")
+    return guard_request
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Scheduler Health
+Heartbeat, tick timing and send-lag metrics for the reminder scheduler
+
+Served by a small standard-library HTTP listener on SCHEDULER_HEALTH_PORT:
+    GET /health   200 when healthy, 503 otherwise
+    GET /metrics  full metrics snapshot as JSON
+
+Send lag is the actual send time minus the intended reminder time. The
+scheduler is unhealthy when its loop has not ticked recently, when recent
+sends or still-pending overdue reminders exceed REMINDER_LAG_SLO_SECONDS, or
+when a reminder missed its send window (it is never sent after that) within
+RECENT_LAG_WINDOW_SECONDS.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCHEDULER_HEALTH_PORT = int(os.environ.get("SCHEDULER_HEALTH_PORT", "8003"))
+REMINDER_LAG_SLO_SECONDS = float(os.environ.get("REMINDER_LAG_SLO_SECONDS", "300"))
+SCHEDULER_STALE_SECONDS = float(os.environ.get("SCHEDULER_STALE_SECONDS", "180"))
+
+# Histogram bucket upper bounds in seconds; the last bucket catches everything above
+LAG_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1800)
+# Only sends within this window count towards health
+RECENT_LAG_WINDOW_SECONDS = float(os.environ.get("RECENT_LAG_WINDOW_SECONDS", "900"))
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerMetrics:
+    def __init__(self, lag_slo_seconds: float = REMINDER_LAG_SLO_SECONDS,
+                 stale_seconds: float = SCHEDULER_STALE_SECONDS):
+        """Initialize empty metrics"""
+        self.lag_slo_seconds = lag_slo_seconds
+        self.stale_seconds = stale_seconds
+        self.started_at = time.time()
+        self.last_tick_at = None
+        self.last_tick_duration = None
+        self.max_tick_duration = 0.0
+        self.ticks = 0
+        self.pending_reminders = 0
+        self.max_pending_overdue = 0.0
+        self.sends = 0
+        self.lag_histogram = [0] * (len(LAG_BUCKETS) + 1)
+        self.lag_sum = 0.0
+        self.missed = 0
+        self._recent_lags = deque()
+        self._recent_missed = deque()
+        self._lock = threading.Lock()
+
+    def record_tick(self, started_at: float, duration: float):
+        with self._lock:
+            self.ticks += 1
+            self.last_tick_at = started_at + duration
+            self.last_tick_duration = duration
+            self.max_tick_duration = max(self.max_tick_duration, duration)
+
+    def record_pending(self, pending: int, max_overdue_seconds: float):
+        """Pending reminder count and how far the most overdue one is past its reminder time"""
+        with self._lock:
+            self.pending_reminders = pending
+            self.max_pending_overdue = max(0.0, max_overdue_seconds)
+
+    def record_send_lag(self, lag_seconds: float):
+        lag_seconds = max(0.0, lag_seconds)
+        with self._lock:
+            self.sends += 1
+            self.lag_sum += lag_seconds
+            self.lag_histogram[bisect.bisect_left(LAG_BUCKETS, lag_seconds)] += 1
+            self._recent_lags.append((time.time(), lag_seconds))
+
+    def record_missed(self, overdue_seconds: float):
+        """A reminder dropped unsent because it is past its send window"""
+        with self._lock:
+            self.missed += 1
+            self._recent_missed.append((time.time(), overdue_seconds))
+
+    def _recent_missed_count(self) -> int:
+        """Reminders missed inside the recent window (caller holds the lock)"""
+        cutoff = time.time() - RECENT_LAG_WINDOW_SECONDS
+        while self._recent_missed and self._recent_missed[0][0] < cutoff:
+            self._recent_missed.popleft()
+        return len(self._recent_missed)
+
+    def _recent_max_lag(self) -> float:
+        """Worst lag among sends inside the recent window (caller holds the lock)"""
+        cutoff = time.time() - RECENT_LAG_WINDOW_SECONDS
+        while self._recent_lags and self._recent_lags[0][0] < cutoff:
+            self._recent_lags.popleft()
+        return max((lag for _, lag in self._recent_lags), default=None)
+
+    def health(self) -> tuple:
+        """(healthy, reasons) against the heartbeat and lag SLO"""
+        reasons = []
+        with self._lock:
+            heartbeat = self.last_tick_at or self.started_at
+            if time.time() - heartbeat > self.stale_seconds:
+                reasons.append(f"no scheduler tick for {time.time() - heartbeat:.0f}s")
+            recent_max = self._recent_max_lag()
+            if recent_max is not None and recent_max > self.lag_slo_seconds:
+                reasons.append(f"recent send lag {recent_max:.0f}s exceeds SLO {self.lag_slo_seconds:g}s")
+            if self.max_pending_overdue > self.lag_slo_seconds:
+                reasons.append(f"pending reminder overdue by {self.max_pending_overdue:.0f}s")
+            recent_missed = self._recent_missed_count()
+            if recent_missed:
+                reasons.append(f"{recent_missed} reminders missed their send window in the last "
+                               f"{RECENT_LAG_WINDOW_SECONDS:g}s")
+        return not reasons, reasons
+
+    def snapshot(self) -> dict:
+        healthy, reasons = self.health()
+        with self._lock:
+            buckets = {f"le_{bound}": count for bound, count in zip(LAG_BUCKETS, self.lag_histogram)}
+            buckets["gt_" + str(LAG_BUCKETS[-1])] = self.lag_histogram[-1]
+            return {
+                "healthy": healthy,
+                "reasons": reasons,
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "ticks": self.ticks,
+                "last_tick_at": self.last_tick_at,
+                "seconds_since_last_tick": round(time.time() - self.last_tick_at, 1) if self.last_tick_at else None,
+                "last_tick_duration": self.last_tick_duration,
+                "max_tick_duration": self.max_tick_duration,
+                "pending_reminders": self.pending_reminders,
+                "max_pending_overdue_seconds": round(self.max_pending_overdue, 1),
+                "missed_reminders": self.missed,
+                "recent_missed_reminders": self._recent_missed_count(),
+                "send_lag": {
+                    "slo_seconds": self.lag_slo_seconds,
+                    "count": self.sends,
+                    "mean_seconds": round(self.lag_sum / self.sends, 2) if self.sends else None,
+                    "recent_max_seconds": self._recent_max_lag(),
+                    "histogram": buckets
+                }
+            }
+
+
+def start_health_server(metrics: SchedulerMetrics, port: int = SCHEDULER_HEALTH_PORT, host: str = "0.0.0.0"):
+    """Serve /health and /metrics on a daemon thread; returns the server (None when port is 0)"""
+    if not port:
+        return None
+
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/health":
+                healthy, reasons = metrics.health()
+                self._send(200 if healthy else 503, {"status": "healthy" if healthy else "unhealthy", "reasons": reasons})
+            elif self.path == "/metrics":
+                self._send(200, metrics.snapshot())
+            else:
+                self._send(404, {"status": "error", "message": "Not found"})
+
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            # Health probes would flood the scheduler log
+            pass
+
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="scheduler-health", daemon=True).start()
+    logger.info(f"Scheduler health listener on {host}:{port} (/health, /metrics)")
+    return server
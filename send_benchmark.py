@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Send Engine Benchmark
+Throughput and memory of the threaded send path vs the async send engine against the local AISensy stand-in
+
+Starts aisensy_stub.py, then runs each engine in a fresh process so peak RSS
+is measured per engine:
+
+    threads  ThreadPoolExecutor of --concurrency workers calling requests.post (the tenant pool path)
+    async    AsyncSendEngine with --concurrency requests in flight over its aiohttp pool
+
+By default only the HTTP transport is measured. --full-path instead times one
+real ReminderScheduler tick over --sends due reminders, in a scratch directory
+with the AISensy budget lifted: quota state, delivery log, sent journal and the
+fold into the reminders file are all included.
+
+Usage:
+    python send_benchmark.py --sends 5000 --concurrency 1000 --latency 0.2
+    python send_benchmark.py --sends 2000 --concurrency 50 --latency 0.05 --full-path
+"""
+
+import argparse
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+STUB_PATH = "/campaign/t2/api/v2"
+STUB_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aisensy_stub.py")
+
+
+def sample_payload(n: int) -> dict:
+    return {
+        "apiKey": "benchmark",
+        "campaignName": "1hour Reminder 1on1",
+        "destination": f"+9190000{n:05d}",
+        "userName": "Benchmark",
+        "templateParams": ["Benchmark User", "10:00 AM", "https://meet.example.com/benchmark"]
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_threads(url: str, sends: int, concurrency: int) -> dict:
+    import requests
+
+    peak_threads = 0
+    ok = 0
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(requests.post, url, json=sample_payload(n), timeout=30) for n in range(sends)]
+        not_done = futures
+        while not_done:
+            peak_threads = max(peak_threads, threading.active_count())
+            _, not_done = wait(not_done, timeout=0.1)
+        for future in futures:
+            try:
+                ok += future.result().status_code == 200
+            except Exception:
+                pass
+    return {"ok": ok, "seconds": time.monotonic() - started, "peak_threads": peak_threads}
+
+
+def run_async(url: str, sends: int, concurrency: int) -> dict:
+    from async_sender import AsyncSendEngine
+
+    engine = AsyncSendEngine(max_in_flight=concurrency, tenant_in_flight=concurrency,
+                             max_connections=concurrency, max_pending=sends, tenant_max_pending=sends)
+    peak_threads = 0
+    ok = 0
+    started = time.monotonic()
+    futures = [engine.submit(engine.post(url, sample_payload(n), "benchmark"), "benchmark") for n in range(sends)]
+    not_done = futures
+    while not_done:
+        peak_threads = max(peak_threads, threading.active_count())
+        _, not_done = wait(not_done, timeout=0.1)
+    for future in futures:
+        try:
+            ok += future.result().status_code == 200
+        except Exception:
+            pass
+    elapsed = time.monotonic() - started
+    engine.shutdown()
+    return {"ok": ok, "seconds": elapsed, "peak_threads": peak_threads}
+
+
+def run_scheduler_tick(url: str, sends: int, concurrency: int) -> dict:
+    """One scheduler tick end to end; the engine and limits come from the environment set by main()"""
+    os.chdir(tempfile.mkdtemp(prefix="send-benchmark-"))
+    due = (datetime.now() + timedelta(minutes=40)).isoformat()
+    with open("meeting_reminders.json", "w") as f:
+        json.dump([{"webhook_id": f"bench-{n}", "tenant_id": "default", "phone": sample_payload(n)["destination"],
+                    "email": None, "name": "Benchmark User", "meeting_datetime": due,
+                    "meeting_link": "https://meet.example.com/benchmark", "reminder_sent": False} for n in range(sends)], f)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import logging
+    import main as scheduler_service
+    logging.disable(logging.INFO)
+
+    scheduler = scheduler_service.ReminderScheduler()
+    peak_threads = 0
+    started = time.monotonic()
+    tick = threading.Thread(target=scheduler._check_and_send_reminders)
+    tick.start()
+    while tick.is_alive():
+        peak_threads = max(peak_threads, threading.active_count())
+        tick.join(timeout=0.1)
+    elapsed = time.monotonic() - started
+    with open("meeting_reminders.json") as f:
+        ok = sum(reminder["reminder_sent"] for reminder in json.load(f))
+    if scheduler_service.send_engine is not None:
+        scheduler_service.send_engine.shutdown()
+    return {"ok": ok, "seconds": elapsed, "peak_threads": peak_threads}
+
+
+def full_path_env(engine: str, url: str, sends: int, concurrency: int) -> dict:
+    return dict(os.environ, AISENSY_URL=url, AISENSY_SEND_ENGINE=engine, AISENSY_RATE_PER_SECOND="1000000",
+                AISENSY_BURST="1000000", TENANT_POOL_SIZE=str(concurrency), TENANT_QUEUE_SIZE=str(sends),
+                ASYNC_MAX_IN_FLIGHT=str(concurrency), ASYNC_TENANT_IN_FLIGHT=str(concurrency),
+                ASYNC_MAX_CONNECTIONS=str(concurrency), ASYNC_MAX_PENDING=str(sends), ASYNC_TENANT_MAX_PENDING=str(sends),
+                SCHEDULER_HEALTH_PORT="0")
+
+
+def run_engine(engine: str, url: str, sends: int, concurrency: int, full_path: bool = False) -> dict:
+    if full_path:
+        result = run_scheduler_tick(url, sends, concurrency)
+    else:
+        result = (run_async if engine == "async" else run_threads)(url, sends, concurrency)
+    result.update({
+        "engine": engine,
+        "full_path": full_path,
+        "sends": sends,
+        "concurrency": concurrency,
+        "seconds": round(result["seconds"], 2),
+        "sends_per_second": round(sends / result["seconds"], 1),
+        "peak_rss_mb": peak_rss_mb()
+    })
+    return result
+
+
+def wait_for_port(port: int, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"AISensy stand-in did not start on port {port}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the threaded and async AISensy send paths")
+    parser.add_argument("--sends", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stand-in response latency in seconds")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--engines", default="threads,async", help="Comma-separated engines to run")
+    parser.add_argument("--full-path", action="store_true", help="Time a real scheduler tick instead of bare HTTP")
+    parser.add_argument("--run", choices=["threads", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    url = f"http://127.0.0.1:{args.port}{STUB_PATH}"
+    if args.run:
+        # Child process: one engine, result as JSON on stdout
+        print(json.dumps(run_engine(args.run, url, args.sends, args.concurrency, args.full_path)))
+        return 0
+
+    stub = subprocess.Popen([sys.executable, STUB_SCRIPT, "--port", str(args.port),
+                             "--latency", str(args.latency)], stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(args.port)
+        for engine in args.engines.split(","):
+            child = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run", engine, "--port", str(args.port),
+                 "--sends", str(args.sends), "--concurrency", str(args.concurrency)]
+                + (["--full-path"] if args.full_path else []),
+                capture_output=True, text=True,
+                env=full_path_env(engine, url, args.sends, args.concurrency) if args.full_path else None
+            )
+            if child.returncode != 0:
+                print(f"{engine}: failed\n{child.stderr}", file=sys.stderr)
+                continue
+            print(child.stdout.strip().splitlines()[-1])
+    finally:
+        stub.terminate()
+        stub.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tenant Routing
+Per-tenant AISensy credentials, campaigns and isolated send pools
+
+Tenants are loaded from TENANTS_CONFIG_FILE (JSON). Requests are routed by the
+/t/<tenant_id>/... webhook path or by the Brevo account_email; anything else
+goes to the default tenant built from the services' module constants.
+
+Example tenants.json:
+
+    {
+      "tenants": [
+        {
+          "id": "sales",
+          "api_key_env": "SALES_AISENSY_API_KEY",
+          "confirmation_campaign": "Sales Call Booked",
+          "reminder_campaign": "Sales Call Reminder",
+          "user_name": "Sales Team",
+          "account_emails": ["sales@example.com"],
+          "webhook_secret_env": "SALES_BREVO_WEBHOOK_SECRET",
+          "pool_size": 4,
+          "queue_size": 100
+        }
+      ]
+    }
+
+Each tenant sends through its own bounded thread pool and quota bucket, so a
+burst for one tenant queues (and is shed) inside that tenant only.
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from quota_governor import AISENSY_QUOTA_STATE_FILE, QuotaGovernor
+
+TENANTS_CONFIG_FILE = os.environ.get("TENANTS_CONFIG_FILE", "tenants.json")
+DEFAULT_TENANT_ID = "default"
+TENANT_POOL_SIZE = int(os.environ.get("TENANT_POOL_SIZE", "4"))
+TENANT_QUEUE_SIZE = int(os.environ.get("TENANT_QUEUE_SIZE", "100"))
+
+logger = logging.getLogger(__name__)
+
+
+class Tenant:
+    def __init__(self, tenant_id: str, api_key: str, confirmation_campaign: str, reminder_campaign: str,
+                 user_name: str, account_emails: list = None, pool_size: int = TENANT_POOL_SIZE,
+                 queue_size: int = TENANT_QUEUE_SIZE, quota_state_file: str = None, webhook_secret: str = None):
+        """Initialize a tenant with its own send pool and quota bucket"""
+        self.tenant_id = tenant_id
+        self.api_key = api_key
+        self.confirmation_campaign = confirmation_campaign
+        self.reminder_campaign = reminder_campaign
+        self.user_name = user_name
+        self.account_emails = [email.lower() for email in (account_emails or [])]
+        self.pool_size = pool_size
+        self.queue_size = queue_size
+        self.webhook_secret = webhook_secret
+        self.quota_governor = QuotaGovernor(quota_state_file or f"aisensy_quota_{tenant_id}.json")
+        self.rejected = 0
+        self._in_flight = 0
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix=f"send-{tenant_id}")
+        self._slots = threading.BoundedSemaphore(pool_size + queue_size)
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """Run func on this tenant's send pool; returns a Future, or None when the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            logger.warning(f"Send queue full for tenant {self.tenant_id}, rejecting send")
+            return None
+
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(func, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Stop accepting sends; cancel_futures drops queued sends that have not started"""
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> dict:
+        return {
+            "tenant_id": self.tenant_id,
+            "confirmation_campaign": self.confirmation_campaign,
+            "reminder_campaign": self.reminder_campaign,
+            "pool_size": self.pool_size,
+            "queue_size": self.queue_size,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected
+        }
+
+
+class TenantRegistry:
+    def __init__(self, default_tenant: Tenant, config_file: str = TENANTS_CONFIG_FILE):
+        """Load tenants from config; the default tenant handles unrouted traffic"""
+        self.default_tenant = default_tenant
+        self._tenants = {default_tenant.tenant_id: default_tenant}
+        self._by_account_email = {}
+        self._load(config_file)
+
+    def _load(self, config_file: str):
+        if not os.path.exists(config_file):
+            logger.info(f"No tenant config at {config_file}, using the default tenant only")
+            return
+
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+
+        for entry in config.get("tenants", []):
+            api_key = entry.get("api_key") or os.environ.get(entry.get("api_key_env", ""), "")
+            if not entry.get("id") or not api_key:
+                logger.error(f"Skipping tenant without id or API key: {entry.get('id')}")
+                continue
+            tenant = Tenant(
+                entry["id"],
+                api_key,
+                entry.get("confirmation_campaign", self.default_tenant.confirmation_campaign),
+                entry.get("reminder_campaign", self.default_tenant.reminder_campaign),
+                entry.get("user_name", self.default_tenant.user_name),
+                entry.get("account_emails"),
+                int(entry.get("pool_size", TENANT_POOL_SIZE)),
+                int(entry.get("queue_size", TENANT_QUEUE_SIZE)),
+                webhook_secret=entry.get("webhook_secret") or os.environ.get(entry.get("webhook_secret_env", ""))
+            )
+            self._tenants[tenant.tenant_id] = tenant
+            for email in tenant.account_emails:
+                self._by_account_email[email] = tenant
+        logger.info(f"Loaded tenants: {sorted(self._tenants)}")
+
+    def get(self, tenant_id: str) -> Tenant:
+        """Tenant by id (None if unknown); a missing id means the default tenant"""
+        if not tenant_id:
+            return self.default_tenant
+        return self._tenants.get(tenant_id)
+
+    def resolve(self, webhook_data: dict, tenant_id: str = None) -> Tenant:
+        """Tenant for a webhook: explicit path id first, then Brevo account_email"""
+        if tenant_id:
+            return self._tenants.get(tenant_id)
+        account_email = webhook_data.get("account_email") if isinstance(webhook_data, dict) else None
+        if isinstance(account_email, str):
+            return self._by_account_email.get(account_email.lower(), self.default_tenant)
+        return self.default_tenant
+
+    def all(self) -> list:
+        return list(self._tenants.values())
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        for tenant in self._tenants.values():
+            tenant.shutdown(wait, cancel_futures)
+
+
+def build_registry(api_key: str, confirmation_campaign: str, reminder_campaign: str, user_name: str) -> TenantRegistry:
+    """Registry whose default tenant comes from a service's hardcoded settings"""
+    default_tenant = Tenant(DEFAULT_TENANT_ID, api_key, confirmation_campaign, reminder_campaign, user_name,
+                            quota_state_file=AISENSY_QUOTA_STATE_FILE)
+    return TenantRegistry(default_tenant)
@@ -0,0 +1,34 @@
+"""Async send engine admission limits"""
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import wait
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("aiohttp")
+from async_sender import AsyncSendEngine  # noqa: E402
+
+
+def test_one_tenant_cannot_fill_the_engine():
+    engine = AsyncSendEngine(max_pending=10, tenant_max_pending=3)
+    try:
+        busy = [engine.submit(asyncio.sleep(0.2), "busy") for _ in range(5)]
+        quiet = [engine.submit(asyncio.sleep(0.2), "quiet") for _ in range(3)]
+        assert sum(future is not None for future in busy) == 3
+        assert all(future is not None for future in quiet)
+        assert engine.stats()["tenants"]["busy"] == {"pending": 3, "rejected": 2}
+
+        wait([future for future in busy + quiet if future is not None], timeout=5)
+        # Slots are released by done-callbacks, which may run just after wait() returns
+        deadline = time.monotonic() + 5
+        while engine.stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert engine.stats()["pending"] == 0
+        assert engine.submit(asyncio.sleep(0), "busy") is not None
+    finally:
+        engine.shutdown()
@@ -0,0 +1,125 @@
+"""Scheduler tick tests against the local AISensy stand-in"""
+
+import asyncio
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aisensy_stub import AISensyStub  # noqa: E402
+
+STUB_LATENCY = 2.0
+
+
+@pytest.fixture(scope="module")
+def scheduler_service(tmp_path_factory):
+    """main imported from a scratch directory (it opens its log and tenant config relative to the cwd)"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("scheduler"))
+    try:
+        yield importlib.import_module("main")
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def stub():
+    """AISensy stand-in on its own loop thread, answering after STUB_LATENCY seconds"""
+    stub = AISensyStub(latency=STUB_LATENCY)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(stub.handle_connection, "127.0.0.1", 0))
+    stub.url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/campaign/t2/api/v2"
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield stub
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def write_due_reminder(scheduler_service, webhook_id: str, past_reminder_time: timedelta = timedelta(0),
+                       created_at: datetime = None):
+    meeting = datetime.now() + timedelta(hours=1) - past_reminder_time
+    created_at = created_at or datetime.now() - timedelta(days=1)
+    with open(scheduler_service.REMINDERS_JSON_FILE, "w") as f:
+        json.dump([{"webhook_id": webhook_id, "tenant_id": "default", "phone": "+919000000001", "email": None,
+                    "name": "Test User", "meeting_datetime": meeting.isoformat(),
+                    "meeting_link": "https://meet.example.com/test", "reminder_sent": False,
+                    "created_at": created_at.isoformat()}], f)
+
+
+def load_reminder(scheduler_service) -> dict:
+    with open(scheduler_service.REMINDERS_JSON_FILE) as f:
+        return json.load(f)[0]
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_send_outliving_tick_wait_is_not_resent(scheduler_service, stub, engine, tmp_path, monkeypatch):
+    """A send still in flight when its tick stops waiting is folded, not resubmitted, by the next tick"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scheduler_service, "AISENSY_URL", stub.url)
+    monkeypatch.setattr(scheduler_service, "TENANT_SEND_TIMEOUT", STUB_LATENCY / 4)
+    if engine == "async":
+        async_sender = pytest.importorskip("async_sender")
+        if async_sender.aiohttp is None:
+            pytest.skip("aiohttp is not installed")
+        monkeypatch.setattr(scheduler_service, "send_engine", async_sender.AsyncSendEngine())
+    write_due_reminder(scheduler_service, f"slow-send-{engine}")
+
+    scheduler = scheduler_service.ReminderScheduler()
+    try:
+        scheduler._check_and_send_reminders()
+        assert stub.requests == 1
+        assert not load_reminder(scheduler_service)["reminder_sent"]
+
+        # The send completes and journals itself between ticks
+        time.sleep(STUB_LATENCY * 1.5)
+        assert not scheduler.in_flight_sends
+
+        scheduler._check_and_send_reminders()
+        assert stub.requests == 1
+        assert load_reminder(scheduler_service)["reminder_sent"]
+    finally:
+        if scheduler_service.send_engine is not None:
+            scheduler_service.send_engine.shutdown()
+
+
+def test_reminder_past_send_window_is_reported_missed(scheduler_service, stub, tmp_path, monkeypatch):
+    """After a stall longer than the send window the reminder is flagged missed once and health fails"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scheduler_service, "AISENSY_URL", stub.url)
+    write_due_reminder(scheduler_service, "stalled", past_reminder_time=timedelta(minutes=40))
+
+    scheduler = scheduler_service.ReminderScheduler()
+    scheduler._check_and_send_reminders()
+    scheduler._check_and_send_reminders()
+
+    assert stub.requests == 0
+    assert load_reminder(scheduler_service)["reminder_missed"]
+    assert scheduler.metrics.missed == 1
+    healthy, reasons = scheduler.metrics.health()
+    assert not healthy
+    assert any("missed their send window" in reason for reason in reasons)
+
+
+def test_reminder_booked_after_send_window_is_not_counted(scheduler_service, stub, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scheduler_service, "AISENSY_URL", stub.url)
+    write_due_reminder(scheduler_service, "late-booking", past_reminder_time=timedelta(minutes=40),
+                       created_at=datetime.now())
+
+    scheduler = scheduler_service.ReminderScheduler()
+    scheduler._check_and_send_reminders()
+
+    assert stub.requests == 0
+    assert load_reminder(scheduler_service)["reminder_missed"]
+    assert scheduler.metrics.missed == 0
+    assert scheduler.metrics.health()[0]
@@ -0,0 +1,66 @@
+"""Request guard: admin and signed-endpoint checks"""
+
+import hashlib
+import hmac
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+flask = pytest.importorskip("flask")
+import request_guard  # noqa: E402
+
+
+def guarded_app(monkeypatch, app_env: str, admin_secret: str = None, receipt_secret: str = None):
+    monkeypatch.setattr(request_guard, "APP_ENV", app_env)
+    app = flask.Flask(__name__)
+
+    @app.route('/admin', methods=['GET'])
+    def admin():
+        return "ok"
+
+    @app.route('/receipts', methods=['POST'])
+    def receipts():
+        return "ok"
+
+    request_guard.install_request_guard(
+        app,
+        signed_endpoints={"receipts": lambda view_args: receipt_secret},
+        debug_endpoints=set(),
+        rate_limiter=request_guard.IPRateLimiter(per_minute=0),
+        admin_endpoints={"admin"},
+        admin_secret=admin_secret,
+        secret_required_in_production={"receipts"}
+    )
+    return app.test_client()
+
+
+@pytest.mark.parametrize("app_env", ["development", "production"])
+def test_admin_without_secret_fails_closed(monkeypatch, app_env):
+    client = guarded_app(monkeypatch, app_env)
+    assert client.get("/admin").status_code == 404
+    assert client.get("/admin", headers={"Authorization": "Bearer anything"}).status_code == 404
+
+
+def test_admin_with_secret_requires_it(monkeypatch):
+    client = guarded_app(monkeypatch, "development", admin_secret="admin-secret")
+    assert client.get("/admin").status_code == 401
+    assert client.get("/admin", headers={"X-Admin-Secret": "wrong"}).status_code == 401
+    assert client.get("/admin", headers={"Authorization": "Bearer admin-secret"}).status_code == 200
+    assert client.get("/admin", headers={"X-Admin-Secret": "admin-secret"}).status_code == 200
+
+
+def test_unconfigured_receipts_refused_in_production_only(monkeypatch):
+    assert guarded_app(monkeypatch, "development").post("/receipts", json={}).status_code == 200
+    assert guarded_app(monkeypatch, "production").post("/receipts", json={}).status_code == 404
+
+
+def test_receipts_require_hmac_signature(monkeypatch):
+    client = guarded_app(monkeypatch, "production", receipt_secret="receipt-secret")
+    body = b'{"messages": []}'
+    signature = hmac.new(b"receipt-secret", body, hashlib.sha256).hexdigest()
+    headers = {"Content-Type": "application/json"}
+    assert client.post("/receipts", data=body, headers=headers).status_code == 401
+    assert client.post("/receipts", data=body, headers={**headers, "X-Webhook-Signature": signature}).status_code == 200